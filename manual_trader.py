@@ -1,15 +1,16 @@
 import websocket
 import threading
-import json
-import requests
+import orjson
+import http.client
 import time
 import sys
 import argparse
+import zlib
 import ssl
-import urllib3
 
-# Suppress InsecureRequestWarning when using verify=False
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# orjson returns bytes, which websocket-client sends as a text frame
+loads = orjson.loads
+dumps = orjson.dumps
 
 # ANSI Colors
 GREEN = '\033[92m'
@@ -24,7 +25,6 @@ class ManualTrader:
         self.host = host
         self.scenario = scenario
         self.secure = secure
-        self.http_proto = "https" if secure else "http"
         self.ws_proto = "wss" if secure else "ws"
         self.student_id = name
         self.password = password
@@ -34,29 +34,46 @@ class ManualTrader:
         self.ws_market = None
         self.running = True
         self.last_snapshot_hash = None
+        self._last_crc = None
         
         # Tracking
         self.inventory = 0
         self.pnl = 0.0
 
+        # Message type -> handler
+        self._md_dispatch = {
+            "MARKET_DATA": self._handle_snapshot,
+            "SNAPSHOT": self._handle_snapshot,
+            "CONNECTED": self._handle_connected,
+        }
+        self._order_dispatch = {
+            "FILL": self._handle_fill,
+            "ERROR": self._handle_error,
+            "AUTHENTICATED": self._handle_auth,
+        }
+
     def register(self):
         print(f"Registering for scenario {self.scenario}...")
         try:
-            url = f"{self.http_proto}://{self.host}/api/replays/{self.scenario}/start"
             headers = {"Authorization": f"Bearer {self.student_id}"}
             if self.password:
                 headers["X-Team-Password"] = self.password
-            resp = requests.get(
-                url, 
-                headers=headers,
-                timeout=5,
-                verify=not self.secure  # Disable SSL verification for self-signed certs
-            )
-            if resp.status_code != 200:
-                print(f"{RED}Registration failed: {resp.text}{RESET}")
+            if self.secure:
+                # Disable SSL verification for self-signed certs
+                conn = http.client.HTTPSConnection(self.host, timeout=5, context=ssl._create_unverified_context())
+            else:
+                conn = http.client.HTTPConnection(self.host, timeout=5)
+            try:
+                conn.request("GET", f"/api/replays/{self.scenario}/start", headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            finally:
+                conn.close()
+            if resp.status != 200:
+                print(f"{RED}Registration failed: {body.decode(errors='replace')}{RESET}")
                 return False
             
-            data = resp.json()
+            data = loads(body)
             self.token = data.get("token")
             self.run_id = data.get("run_id")
             print(f"{GREEN}Registered! Run ID: {self.run_id}{RESET}")
@@ -66,43 +83,50 @@ class ManualTrader:
             return False
 
     def on_market_message(self, ws, message):
-        data = json.loads(message)
-        msg_type = data.get("type")
+        # Identical frame to the last one - nothing to parse or redraw
+        raw = message.encode() if isinstance(message, str) else message
+        crc = zlib.crc32(raw)
+        if crc == self._last_crc:
+            return
+        self._last_crc = crc
         
-        if msg_type == "CONNECTED":
-            print(f"\n{GREEN}[MARKET] Connected: {data.get('message')}{RESET}")
-            print("> ", end="", flush=True)
+        data = loads(raw)
+        # Unknown message types are ignored
+        handler = self._md_dispatch.get(data.get("type"))
+        if handler:
+            handler(data)
 
-        elif msg_type == "MARKET_DATA" or msg_type == "SNAPSHOT":
-            bids = data.get("bids", [])
-            asks = data.get("asks", [])
-            last_price = data.get("last_trade", 0.0)
-            
-            # Create a hash to check if book changed (simple string repr)
-            # We want to update if ANY price/qty changes in top 10
-            current_snapshot = json.dumps({
-                "bids": bids[:10],
-                "asks": asks[:10],
-                "last": last_price,
-                "step": data.get("step") 
-            })
-            
-            # Always display if forced or changed
-            if current_snapshot != self.last_snapshot_hash:
-                self.display_book(bids, asks, last_price)
-                self.last_snapshot_hash = current_snapshot
+    def _handle_connected(self, data):
+        print(f"\n{GREEN}[MARKET] Connected: {data.get('message')}{RESET}")
+        print("> ", end="", flush=True)
+
+    def _handle_snapshot(self, data):
+        bids = data.get("bids", [])
+        asks = data.get("asks", [])
+        last_price = data.get("last_trade", 0.0)
         
-        else:
-             # Debug unknown messages
-             pass
+        # Fingerprint the book to check if it changed
+        # We want to update if ANY price/qty changes in top 10
+        current_snapshot = hash((
+            tuple((b.get('price'), b.get('qty')) for b in bids[:10]),
+            tuple((a.get('price'), a.get('qty')) for a in asks[:10]),
+            last_price,
+            data.get("step")
+        ))
+        
+        # Always display if forced or changed
+        if current_snapshot != self.last_snapshot_hash:
+            self.display_book(bids, asks, last_price)
+            self.last_snapshot_hash = current_snapshot
 
     def display_book(self, bids, asks, last_price):
-        # We'll just print a big block.
-        
-        print(f"\n{BLUE}================ MARKET SNAPSHOT ================{RESET}")
-        print(f"Last Trade: {CYAN}{last_price:.2f}{RESET}")
-        print(f"{'BID QTY':>10} | {'BID PRICE':>10} || {'ASK PRICE':<10} | {'ASK QTY':<10}")
-        print("-" * 50)
+        # We'll just print a big block, built up and written in one go.
+        buf = [
+            f"\n{BLUE}================ MARKET SNAPSHOT ================{RESET}\n",
+            f"Last Trade: {CYAN}{last_price:.2f}{RESET}\n",
+            f"{'BID QTY':>10} | {'BID PRICE':>10} || {'ASK PRICE':<10} | {'ASK QTY':<10}\n",
+            "-" * 50 + "\n",
+        ]
         
         depth = 10
         for i in range(depth):
@@ -127,36 +151,44 @@ class ManualTrader:
             else:
                 ask_str = f"{'':<10} | {'':<10}"
                 
-            print(f"{bid_str} || {ask_str}")
+            buf.append(f"{bid_str} || {ask_str}\n")
             
-        print(f"{BLUE}================================================={RESET}")
-        print(f"Inv: {self.inventory} | PnL: {self.pnl:.2f}")
-        print("> ", end="", flush=True)
+        buf.append(f"{BLUE}================================================={RESET}\n")
+        buf.append(f"Inv: {self.inventory} | PnL: {self.pnl:.2f}\n")
+        buf.append("> ")
+        sys.stdout.write("".join(buf))
+        sys.stdout.flush()
 
     def on_order_message(self, ws, message):
-        data = json.loads(message)
-        msg_type = data.get("type")
+        data = loads(message)
+        handler = self._order_dispatch.get(data.get("type"))
+        if handler:
+            handler(data)
+
+    def _handle_fill(self, data):
+        side = data.get("side")
+        price = data.get("price")
+        qty = data.get("qty")
         
-        if msg_type == "FILL":
-            side = data.get("side")
-            price = data.get("price")
-            qty = data.get("qty")
-            
-            if side == "BUY":
-                self.inventory += qty
-                self.pnl -= qty * price 
-            else:
-                self.inventory -= qty
-                self.pnl += qty * price
-                
-            color = GREEN if side == "BUY" else RED
-            print(f"\n{color}*** FILL *** {side} {qty} @ {price:.2f}{RESET}")
-            # Re-print prompt
-            print("> ", end="", flush=True)
+        if side == "BUY":
+            self.inventory += qty
+            self.pnl -= qty * price 
+        else:
+            self.inventory -= qty
+            self.pnl += qty * price
             
-        elif msg_type == "ERROR":
-            print(f"\n{RED}[ERROR] {data.get('message')}{RESET}")
-            print("> ", end="", flush=True)
+        color = GREEN if side == "BUY" else RED
+        print(f"\n{color}*** FILL *** {side} {qty} @ {price:.2f}{RESET}")
+        # Re-print prompt
+        print("> ", end="", flush=True)
+
+    def _handle_error(self, data):
+        print(f"\n{RED}[ERROR] {data.get('message')}{RESET}")
+        print("> ", end="", flush=True)
+
+    def _handle_auth(self, data):
+        print(f"\n{GREEN}[ORDERS] Authenticated{RESET}")
+        print("> ", end="", flush=True)
 
     def on_error(self, ws, error):
         if self.running:
@@ -216,7 +248,7 @@ class ManualTrader:
                 
                 elif cmd in ["step", "next", "done"]:
                     msg = {"action": "DONE"}
-                    self.ws_order.send(json.dumps(msg))
+                    self.ws_order.send(dumps(msg))
                     print("Sent STEP / DONE")
 
                 elif cmd in ["buy", "sell"]:
@@ -236,7 +268,7 @@ class ManualTrader:
                             "price": price,
                             "qty": qty
                         }
-                        self.ws_order.send(json.dumps(msg))
+                        self.ws_order.send(dumps(msg))
                         print(f"Sent {side} {qty} @ {price} (ID: {order_id})")
                     except ValueError:
                         print("Invalid number")
@@ -247,7 +279,7 @@ class ManualTrader:
                         continue
                     order_id = parts[1]
                     msg = {"type": "CANCEL_ORDER", "order_id": order_id}
-                    self.ws_order.send(json.dumps(msg))
+                    self.ws_order.send(dumps(msg))
                     print(f"Sent CANCEL {order_id}")
                     
         except KeyboardInterrupt:
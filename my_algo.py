@@ -6,22 +6,136 @@ Connect to the exchange simulator, receive market data, submit orders, and GRAPH
     python student_algorithm.py --host ip:host --scenario normal_market --name your_name --password your_password --secure
 
 YOUR TASK:
-    Modify the `decide_order()` method to implement your trading strategy.
+    Modify the `_decide()` function to implement your trading strategy.
 """
 
+import os
 import json
-import websocket
+import asyncio
+import websockets
 import threading
 import argparse
 import time
-import requests
+import http.client
 import ssl
-import urllib3
+from collections import deque
+import numpy as np
 import matplotlib.pyplot as plt  # <--- NEW IMPORT
+from matplotlib.animation import FuncAnimation
 from typing import Dict, Optional
 
-# Suppress SSL warnings for self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Numeric strategy kernels are JIT-compiled with numba (see requirements.txt);
+# without it they run as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+# Hot-path JSON decoder (outgoing frames are pre-serialized bytes).
+# orjson takes str or bytes directly; otherwise reuse one stdlib decoder.
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    _DECODER = json.JSONDecoder()
+    _decode = _DECODER.decode
+    
+    def loads(message):
+        # JSONDecoder only takes str; binary frames arrive as bytes
+        return _decode(message.decode() if isinstance(message, bytes) else message)
+
+# Number of recent steps kept for plotting
+HISTORY_LEN = 500
+
+# Number of recent latency samples kept for stats
+LATENCY_SAMPLES = 1024
+
+# Outstanding order send times kept for fill latency (power of two)
+SEND_SLOTS = 4096
+
+# Strategy only trades on steps that are a multiple of this
+TRADE_EVERY = 50
+
+
+# Order sides as passed to and from the numeric kernels
+BUY = 1
+SELL = -1
+SIDE_NAMES = {BUY: "BUY", SELL: "SELL"}
+
+
+# =============================================================================
+# YOUR STRATEGY - MODIFY THIS FUNCTION!
+# =============================================================================
+
+@njit(cache=True)
+def _decide(inventory, step, bid, ask, mid):
+    """
+    Called on every step from decide_order(). Trade cadence is up to the
+    strategy - the example only trades every TRADE_EVERY steps.
+    
+    Input: inventory (int), step (int), bid, ask, mid (float)
+    Return: (side, price, qty) - side is BUY, SELL or 0 for no order
+    
+    This is compiled by numba, so it only sees the numbers passed in (no
+    `self`, dicts or strings) and every branch must return the same
+    (int, float, int) types. Prices are left unrounded - _send_order
+    writes them to the wire as %.2f.
+    """
+    if mid <= 0 or bid <= 0 or ask <= 0:
+        return 0, 0.0, 0
+    
+    # Only trade every TRADE_EVERY steps
+    if step % TRADE_EVERY != 0:
+        return 0, 0.0, 0
+    
+    # Strategy Logic
+    if inventory > 200:
+        return SELL, bid, 100
+    elif inventory < -200:
+        return BUY, ask, 100
+    elif (step // TRADE_EVERY) % 2 == 0:
+        return BUY, ask, 100
+    else:
+        return SELL, bid, 100
+
+
+@njit(cache=True)
+def _apply_fill(inventory, cash_flow, side, qty, price):
+    """Apply a fill to the position. Returns (inventory, cash_flow)."""
+    if side == BUY:
+        inventory += qty
+        cash_flow -= qty * price
+    else:
+        inventory -= qty
+        cash_flow += qty * price
+    return inventory, cash_flow
+
+
+def _scan_field(message: str, key: str) -> Optional[str]:
+    """Return the raw scalar text after `key` in a JSON frame, or None."""
+    i = message.find(key)
+    if i < 0:
+        return None
+    i = message.find(":", i + len(key)) + 1
+    j = message.find(",", i)
+    k = message.find("}", i)
+    if j < 0 or 0 <= k < j:
+        j = k
+    return message[i:j]
+
+
+# CPU cores for the WebSocket I/O and plotting threads
+IO_CPU = 2
+PLOT_CPU = 0
+
+
+def _pin_thread(cpu: int):
+    """Pin the calling thread to `cpu` if the platform and machine allow it."""
+    if not hasattr(os, "sched_setaffinity"):  # Linux only
+        return
+    if cpu in os.sched_getaffinity(0):
+        os.sched_setaffinity(0, {cpu})
 
 
 class TradingBot:
@@ -37,7 +151,6 @@ class TradingBot:
         self.secure = secure
         
         # Protocol configuration
-        self.http_proto = "https" if secure else "http"
         self.ws_proto = "wss" if secure else "ws"
         
         # Session info (set after registration)
@@ -47,7 +160,6 @@ class TradingBot:
         # Trading state - track your position
         self.inventory = 0      # Current position (positive = long, negative = short)
         self.cash_flow = 0.0    # Cumulative cash from trades (negative when buying)
-        self.pnl = 0.0          # Mark-to-market PnL (cash_flow + inventory * mid_price)
         self.current_step = 0   # Current simulation step
         self.orders_sent = 0    # Number of orders sent
         
@@ -57,22 +169,54 @@ class TradingBot:
         self.last_mid = 0.0
 
         # --- NEW: Data storage for plotting ---
-        self.history_steps = []
-        self.history_mids = []
-        self.history_bids = []
-        self.history_asks = []
+        # Ring buffer of (step, mid, bid, ask) rows, one column per step
+        self._hist = np.empty((4, HISTORY_LEN), dtype=np.float64)
+        self._hidx = 0      # Next column to write
+        self._hcount = 0    # Number of filled columns
         # --------------------------------------
         
         # WebSocket connections
         self.market_ws = None
         self.order_ws = None
         self.running = True
+        self._results_printed = False
+        
+        # asyncio loop serving both connections (runs on the I/O thread)
+        self._io_thread = None
+        self._io_loop = None
+        self._io_stop = None    # asyncio.Event - set to close both streams
         
-        # Latency measurement
+        # Latency measurement (time.perf_counter_ns() integers)
         self.last_done_time = None          # When we sent DONE
-        self.step_latencies = []            # Time between DONE and next market data
-        self.order_send_times = {}          # order_id -> time sent
-        self.fill_latencies = []            # Time between order and fill
+        self.step_latencies = deque(maxlen=LATENCY_SAMPLES)  # Time between DONE and next market data
+        self._step_latency_total = 0        # Running sum over the whole run
+        self._step_latency_count = 0
+        self._send_times = np.zeros(SEND_SLOTS, dtype=np.int64)  # order number -> time sent (0 = none)
+        self.fill_latencies = deque(maxlen=LATENCY_SAMPLES)  # Time between order and fill
+
+        # Pre-serialized wire frames
+        self._done_frame = b'{"action":"DONE"}'
+        self._order_frame = b'{"order_id":"%s","side":"%s","price":%.2f,"qty":%d}'
+        # JSON-escaped once, since the id is spliced into the frame verbatim
+        self._oid_prefix = json.dumps(f"ORD_{student_id}_")[1:-1].encode()
+
+        # Compile the strategy kernels now rather than on the first tick / FILL,
+        # using the argument types decide_order() and the FILL handler pass
+        _decide(0, 1, 1.0, 1.0, 1.0)
+        _apply_fill(0, 0.0, BUY, 1, 1.0)
+
+        # Cached PnL and the (inventory, cash_flow, last_mid) it was computed from
+        self._pnl = 0.0
+        self._pnl_key = (0, 0.0, 0.0)
+    
+    @property
+    def pnl(self) -> float:
+        """Mark-to-market PnL (cash_flow + inventory * mid_price)."""
+        key = (self.inventory, self.cash_flow, self.last_mid)
+        if key != self._pnl_key:
+            self._pnl = self.cash_flow + self.inventory * self.last_mid
+            self._pnl_key = key
+        return self._pnl
     
     # =========================================================================
     # REGISTRATION - Get a token to start trading
@@ -82,22 +226,26 @@ class TradingBot:
         """Register with the server and get an auth token."""
         print(f"[{self.student_id}] Registering for scenario '{self.scenario}'...")
         try:
-            url = f"{self.http_proto}://{self.host}/api/replays/{self.scenario}/start"
             headers = {"Authorization": f"Bearer {self.student_id}"}
             if self.password:
                 headers["X-Team-Password"] = self.password
-            resp = requests.get(
-                url,
-                headers=headers,
-                timeout=10,
-                verify=not self.secure  # Disable SSL verification for self-signed certs
-            )
+            if self.secure:
+                # Disable SSL verification for self-signed certs
+                conn = http.client.HTTPSConnection(self.host, timeout=10, context=ssl._create_unverified_context())
+            else:
+                conn = http.client.HTTPConnection(self.host, timeout=10)
+            try:
+                conn.request("GET", f"/api/replays/{self.scenario}/start", headers=headers)
+                resp = conn.getresponse()
+                body = resp.read().decode()
+            finally:
+                conn.close()
             
-            if resp.status_code != 200:
-                print(f"[{self.student_id}] Registration FAILED: {resp.text}")
+            if resp.status != 200:
+                print(f"[{self.student_id}] Registration FAILED: {body}")
                 return False
             
-            data = resp.json()
+            data = loads(body)
             self.token = data.get("token")
             self.run_id = data.get("run_id")
             
@@ -118,76 +266,125 @@ class TradingBot:
     
     def connect(self) -> bool:
         """Connect to market data and order entry WebSockets."""
+        # Both streams run on one asyncio event loop in a dedicated I/O thread,
+        # leaving the main thread to matplotlib
+        connected = threading.Event()
+        self._io_thread = threading.Thread(
+            target=lambda: asyncio.run(self._io_main(connected)),
+            daemon=True
+        )
+        self._io_thread.start()
+        
+        # Wait for both connections (or a failure)
+        connected.wait()
+        return self.market_ws is not None
+    
+    async def _io_main(self, connected: threading.Event):
+        """Open both streams and receive on them until either closes."""
+        self._io_loop = asyncio.get_running_loop()
+        self._io_stop = asyncio.Event()
+        order_url = f"{self.ws_proto}://{self.host}/api/ws/orders?token={self.token}&run_id={self.run_id}"
+        market_url = f"{self.ws_proto}://{self.host}/api/ws/market?run_id={self.run_id}"
+        
         try:
-            # SSL options for self-signed certificates
-            sslopt = {"cert_reqs": ssl.CERT_NONE} if self.secure else None
-            
-            # Market Data WebSocket
-            market_url = f"{self.ws_proto}://{self.host}/api/ws/market?run_id={self.run_id}"
-            self.market_ws = websocket.WebSocketApp(
-                market_url,
-                on_message=self._on_market_data,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                on_open=lambda ws: print(f"[{self.student_id}] Market data connected")
-            )
+            _pin_thread(IO_CPU)
             
-            # Order Entry WebSocket
-            order_url = f"{self.ws_proto}://{self.host}/api/ws/orders?token={self.token}&run_id={self.run_id}"
-            self.order_ws = websocket.WebSocketApp(
-                order_url,
-                on_message=self._on_order_response,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                on_open=lambda ws: print(f"[{self.student_id}] Order entry connected")
-            )
-            
-            # Start WebSocket threads
-            threading.Thread(
-                target=lambda: self.market_ws.run_forever(sslopt=sslopt),
-                daemon=True
-            ).start()
-            
-            threading.Thread(
-                target=lambda: self.order_ws.run_forever(sslopt=sslopt),
-                daemon=True
-            ).start()
-            
-            # Wait for connections
-            time.sleep(1)
-            return True
+            # SSL context for self-signed certificates
+            sslctx = ssl._create_unverified_context() if self.secure else None
             
+            # Order Entry WebSocket - connected first so the first tick can send DONE
+            async with websockets.connect(order_url, ssl=sslctx, compression=None) as order_ws:
+                # asyncio sets TCP_NODELAY, so order + DONE never wait on Nagle
+                print(f"[{self.student_id}] Order entry connected")
+                
+                async with websockets.connect(market_url, ssl=sslctx, compression=None) as market_ws:
+                    print(f"[{self.student_id}] Market data connected")
+                    
+                    self.order_ws = order_ws
+                    self.market_ws = market_ws
+                    connected.set()
+                    
+                    # Run until either stream closes or _disconnect() asks us to stop
+                    loops = [
+                        asyncio.create_task(self._market_loop()),
+                        asyncio.create_task(self._order_loop()),
+                        asyncio.create_task(self._io_stop.wait())
+                    ]
+                    try:
+                        done, _ = await asyncio.wait(loops, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            task.result()
+                    except Exception as e:
+                        self._on_error(e)
+                    finally:
+                        for task in loops:
+                            task.cancel()
+                        await asyncio.gather(*loops, return_exceptions=True)
+                        self._on_close()
+        
         except Exception as e:
             print(f"[{self.student_id}] Connection error: {e}")
-            return False
+        finally:
+            # Unblock connect() whether or not we got connected
+            connected.set()
+    
+    def _disconnect(self):
+        """Close both connections from the main thread and wait for the I/O thread."""
+        if not (self._io_loop and self._io_thread.is_alive()):
+            return
+        try:
+            # _io_main stops its loops and closes the connections on the way out
+            self._io_loop.call_soon_threadsafe(self._io_stop.set)
+        except RuntimeError:
+            pass  # Event loop already finished
+        self._io_thread.join(timeout=2)
+    
+    async def _market_loop(self):
+        """Receive market data until the connection closes."""
+        on_data = self._on_market_data
+        async for message in self.market_ws:
+            await on_data(message)
+    
+    async def _order_loop(self):
+        """Receive order responses until the connection closes."""
+        on_response = self._on_order_response
+        async for message in self.order_ws:
+            on_response(message)
     
     # =========================================================================
     # MARKET DATA HANDLER - Called when new market data arrives
     # =========================================================================
     
-    def _on_market_data(self, ws, message: str):
+    async def _on_market_data(self, message: str):
         """Handle incoming market data snapshot."""
         try:
-            recv_time = time.time()
-            data = json.loads(message)
+            recv_time = time.perf_counter_ns()
             
-            # Skip connection confirmation messages
-            if data.get("type") == "CONNECTED":
-                return
+            # Only step/bid/ask are used, so skip the full decode when possible
+            tick = self._scan_tick(message)
+            if tick is None:
+                data = loads(message)
+                
+                # Skip connection confirmation messages
+                if data.get("type") == "CONNECTED":
+                    return
+                
+                tick = (data.get("step", 0), data.get("bid", 0.0), data.get("ask", 0.0))
             
             # Measure step latency (time since we sent DONE)
             if self.last_done_time is not None:
-                step_latency = (recv_time - self.last_done_time) * 1000  # ms
+                step_latency = recv_time - self.last_done_time
                 self.step_latencies.append(step_latency)
+                self._step_latency_total += step_latency
+                self._step_latency_count += 1
             
             # Extract market data
-            self.current_step = data.get("step", 0)
-            self.last_bid = data.get("bid", 0.0)
-            self.last_ask = data.get("ask", 0.0)
+            self.current_step, self.last_bid, self.last_ask = tick
             
             # Log progress every 500 steps with latency stats
             if self.current_step % 500 == 0 and self.step_latencies:
-                avg_lat = sum(self.step_latencies[-100:]) / min(len(self.step_latencies), 100)
+                recent = list(self.step_latencies)[-100:]
+                avg_lat = sum(recent) / len(recent) / 1e6  # ms
                 print(f"[{self.student_id}] Step {self.current_step} | Orders: {self.orders_sent} | Inv: {self.inventory} | Avg Latency: {avg_lat:.1f}ms")
             
             # Calculate mid price
@@ -200,11 +397,11 @@ class TradingBot:
             else:
                 self.last_mid = 0
             
-            # --- NEW: Append data for graphing ---
-            self.history_steps.append(self.current_step)
-            self.history_mids.append(self.last_mid)
-            self.history_bids.append(self.last_bid)
-            self.history_asks.append(self.last_ask)
+            # --- NEW: Record data for graphing ---
+            self._hist[:, self._hidx] = (self.current_step, self.last_mid, self.last_bid, self.last_ask)
+            self._hidx = (self._hidx + 1) % HISTORY_LEN
+            if self._hcount < HISTORY_LEN:
+                self._hcount += 1
             # -------------------------------------
             
             # =============================================
@@ -212,101 +409,117 @@ class TradingBot:
             # =============================================
             order = self.decide_order(self.last_bid, self.last_ask, self.last_mid)
             
-            if order and self.order_ws and self.order_ws.sock:
-                self._send_order(order)
+            if order and self.order_ws:
+                await self._send_order(order)
             
             # Signal DONE to advance to next step
-            self._send_done()
+            await self._send_done()
             
         except Exception as e:
             print(f"[{self.student_id}] Market data error: {e}")
     
+    def _scan_tick(self, message: str) -> Optional[tuple]:
+        """
+        Pull (step, bid, ask) straight out of a MARKET_DATA frame.
+        Returns None when the frame needs a full decode.
+        """
+        # Binary frames arrive as bytes - leave those to the full decoder
+        if not isinstance(message, str) or '"MARKET_DATA"' not in message:
+            return None
+        try:
+            return (
+                int(_scan_field(message, '"step"')),
+                float(_scan_field(message, '"bid"')),
+                float(_scan_field(message, '"ask"'))
+            )
+        except (TypeError, ValueError):
+            # Missing or null field - let the full decoder apply defaults
+            return None
+    
+    def _history(self) -> np.ndarray:
+        """Return the recorded (step, mid, bid, ask) rows, oldest first."""
+        if self._hcount < HISTORY_LEN:
+            return self._hist[:, :self._hcount]
+        return np.roll(self._hist, -self._hidx, axis=1)
+    
     # =========================================================================
-    # YOUR STRATEGY - MODIFY THIS METHOD!
+    # STRATEGY HOOK - calls the compiled _decide() strategy
     # =========================================================================
     
     def decide_order(self, bid: float, ask: float, mid: float) -> Optional[Dict]:
         """
+        Called on every step; wraps _decide() with the bot's state.
+        
         Input: bid, ask, mid
         Return: {"side": "BUY"|"SELL", "price": X, "qty": N} or None
         """
-        
-        if mid <= 0 or bid <= 0 or ask <= 0:
-            return None
-        
-        # Only trade every 50 steps
-        if self.current_step % 50 != 0:
+        side, price, qty = _decide(self.inventory, self.current_step, float(bid), float(ask), float(mid))
+        if not side:
             return None
-        
-        # Strategy Logic
-        if self.inventory > 200:
-            return {"side": "SELL", "price": round(bid, 2), "qty": 100}
-        elif self.inventory < -200:
-            return {"side": "BUY", "price": round(ask, 2), "qty": 100}
-        elif (self.current_step // 50) % 2 == 0:
-            return {"side": "BUY", "price": round(ask, 2), "qty": 100}
-        else:
-            return {"side": "SELL", "price": round(bid, 2), "qty": 100}
+        return {"side": SIDE_NAMES[side], "price": price, "qty": qty}
     
     # =========================================================================
     # ORDER HANDLING
     # =========================================================================
     
-    def _send_order(self, order: Dict):
+    async def _send_order(self, order: Dict):
         """Send an order to the exchange."""
-        order_id = f"ORD_{self.student_id}_{self.current_step}_{self.orders_sent}"
-        
-        msg = {
-            "order_id": order_id,
-            "side": order["side"],
-            "price": order["price"],
-            "qty": order["qty"]
-        }
+        order_id = self._oid_prefix + b"%d_%d" % (self.current_step, self.orders_sent)
         
         try:
-            self.order_send_times[order_id] = time.time()
-            self.order_ws.send(json.dumps(msg))
+            # A bad strategy value fails here and is reported; DONE is still sent
+            frame = self._order_frame % (
+                order_id,
+                order["side"].encode(),
+                order["price"],
+                order["qty"]
+            )
+            self._send_times[self.orders_sent & (SEND_SLOTS - 1)] = time.perf_counter_ns()
+            await self.order_ws.send(frame, text=True)
             self.orders_sent += 1
         except Exception as e:
             print(f"[{self.student_id}] Send order error: {e}")
     
-    def _send_done(self):
+    async def _send_done(self):
         """Signal DONE to advance to the next simulation step."""
         try:
-            self.order_ws.send(json.dumps({"action": "DONE"}))
-            self.last_done_time = time.time()
-        except:
+            await self.order_ws.send(self._done_frame, text=True)
+            self.last_done_time = time.perf_counter_ns()
+        except Exception:
             pass
     
-    def _on_order_response(self, ws, message: str):
+    def _on_order_response(self, message: str):
         """Handle order responses and fills."""
         try:
-            recv_time = time.time()
-            data = json.loads(message)
+            recv_time = time.perf_counter_ns()
+            data = loads(message)
             msg_type = data.get("type")
             
             if msg_type == "AUTHENTICATED":
                 print(f"[{self.student_id}] Authenticated - ready to trade!")
             
             elif msg_type == "FILL":
-                qty = data.get("qty", 0)
-                price = data.get("price", 0)
-                side = data.get("side", "")
-                order_id = data.get("order_id", "")
+                try:
+                    qty = data["qty"]
+                    price = data["price"]
+                    side = data["side"]
+                    order_id = data["order_id"]
+                except KeyError as e:
+                    print(f"[{self.student_id}] Malformed FILL, missing {e}")
+                    return
                 
-                if order_id in self.order_send_times:
-                    fill_latency = (recv_time - self.order_send_times[order_id]) * 1000
-                    self.fill_latencies.append(fill_latency)
-                    del self.order_send_times[order_id]
+                # Order ids end with the monotonic order number
+                suffix = order_id.rpartition("_")[2]
+                if suffix.isdigit():
+                    slot = int(suffix) & (SEND_SLOTS - 1)
+                    sent_time = int(self._send_times[slot])
+                    if sent_time:
+                        self.fill_latencies.append(recv_time - sent_time)
+                        self._send_times[slot] = 0
                 
-                if side == "BUY":
-                    self.inventory += qty
-                    self.cash_flow -= qty * price
-                else:
-                    self.inventory -= qty
-                    self.cash_flow += qty * price
-                
-                self.pnl = self.cash_flow + self.inventory * self.last_mid
+                self.inventory, self.cash_flow = _apply_fill(
+                    self.inventory, self.cash_flow, BUY if side == "BUY" else SELL, qty, float(price)
+                )
                 
                 print(f"[{self.student_id}] FILL: {side} {qty} @ {price:.2f} | Inventory: {self.inventory} | PnL: {self.pnl:.2f}")
             
@@ -320,13 +533,14 @@ class TradingBot:
     # ERROR HANDLING
     # =========================================================================
     
-    def _on_error(self, ws, error):
-        if self.running:
+    def _on_error(self, error):
+        # A closed connection is reported by _on_close
+        if self.running and not isinstance(error, websockets.ConnectionClosed):
             print(f"[{self.student_id}] WebSocket error: {error}")
     
-    def _on_close(self, ws, close_status_code, close_msg):
+    def _on_close(self):
         self.running = False
-        print(f"[{self.student_id}] Connection closed (status: {close_status_code})")
+        print(f"[{self.student_id}] Connection closed")
     
     # =========================================================================
     # MAIN RUN LOOP (Modified for Graphing)
@@ -346,13 +560,15 @@ class TradingBot:
         print(f"[{self.student_id}] Running... Press Ctrl+C to stop")
         
         # --- GRAPH SETUP ---
-        plt.ion()  # Interactive mode
+        # Keep matplotlib off the receive threads' cores
+        _pin_thread(PLOT_CPU)
         fig, ax = plt.subplots(figsize=(10, 6))
         
         # Initialize lines
-        line_mid, = ax.plot([], [], 'g-', label='Mid Price', alpha=0.9)
-        line_bid, = ax.plot([], [], 'b--', label='Bid', alpha=0.3)
-        line_ask, = ax.plot([], [], 'r--', label='Ask', alpha=0.3)
+        self._line_mid, = ax.plot([], [], 'g-', label='Mid Price', alpha=0.9)
+        self._line_bid, = ax.plot([], [], 'b--', label='Bid', alpha=0.3)
+        self._line_ask, = ax.plot([], [], 'r--', label='Ask', alpha=0.3)
+        self._ax = ax
         
         ax.set_title(f"Real-time Market Data: {self.scenario}")
         ax.set_xlabel("Step")
@@ -362,49 +578,58 @@ class TradingBot:
         # -------------------
 
         try:
+            # Redraw every 0.5s from the GUI timer; blocks until the window is closed
+            self._ani = FuncAnimation(fig, self._redraw, interval=500, cache_frame_data=False)
+            plt.show()
+            
+            # Non-interactive backends (e.g. Agg) return at once, and closing the
+            # window early must not end the session - trade until it closes
             while self.running:
-                # --- UPDATE GRAPH ---
-                if len(self.history_steps) > 1:
-                    # Limit to last 500 points for performance
-                    steps = self.history_steps[-500:]
-                    mids = self.history_mids[-500:]
-                    bids = self.history_bids[-500:]
-                    asks = self.history_asks[-500:]
-
-                    line_mid.set_data(steps, mids)
-                    line_bid.set_data(steps, bids)
-                    line_ask.set_data(steps, asks)
-                    
-                    ax.relim()
-                    ax.autoscale_view()
-                    
-                    plt.pause(0.5) # Update plot every 0.5s
-                else:
-                    time.sleep(1)
-                # --------------------
+                time.sleep(0.5)
                 
         except KeyboardInterrupt:
             print(f"\n[{self.student_id}] Stopped by user")
         finally:
             self.running = False
-            if self.market_ws:
-                self.market_ws.close()
-            if self.order_ws:
-                self.order_ws.close()
+            self._disconnect()
             
-            print(f"\n[{self.student_id}] Final Results:")
-            print(f"  Orders Sent: {self.orders_sent}")
-            print(f"  Inventory: {self.inventory}")
-            print(f"  PnL: {self.pnl:.2f}")
+            self._print_results()
+    
+    def _print_results(self):
+        """Print the session summary (once - at session end or on exit)."""
+        if self._results_printed:
+            return
+        self._results_printed = True
+        
+        print(f"\n[{self.student_id}] Final Results:")
+        print(f"  Orders Sent: {self.orders_sent}")
+        print(f"  Inventory: {self.inventory}")
+        print(f"  PnL: {self.pnl:.2f}")
+        
+        if self._step_latency_count:
+            print(f"\n  Step Latency (ms):")
+            print(f"    Avg: {self._step_latency_total/self._step_latency_count/1e6:.1f}")
+    
+    def _redraw(self, frame):
+        """Animation callback - push the latest history into the plot lines."""
+        if not self.running:
+            # Report now and keep plot open after finish
+            self._ani.event_source.stop()
+            self._print_results()
+            print("[Info] Close plot window to exit.")
+        
+        if self._hcount > 1:
+            # Only the last HISTORY_LEN points are kept
+            steps, mids, bids, asks = self._history()
             
-            if self.step_latencies:
-                print(f"\n  Step Latency (ms):")
-                print(f"    Avg: {sum(self.step_latencies)/len(self.step_latencies):.1f}")
+            self._line_mid.set_data(steps, mids)
+            self._line_bid.set_data(steps, bids)
+            self._line_ask.set_data(steps, asks)
             
-            # Keep plot open after finish
-            print("[Info] Close plot window to exit.")
-            plt.ioff()
-            plt.show()
+            self._ax.relim()
+            self._ax.autoscale_view()
+        
+        return self._line_mid, self._line_bid, self._line_ask
 
 
 # =============================================================================